@@ -1,9 +1,5 @@
 import streamlit as st
-import os
-import pandas as pd
-import numpy as np
-from polygon import RESTClient
-from datetime import datetime
+from trade_core import POLYGON_KEY, fetch_bars, find_possible_trades
 
 st.set_page_config(
     page_title="Simple Day Trading Helper",
@@ -21,18 +17,18 @@ st.markdown("This tool looks at recent stock prices and suggests possible quick
 # ────────────────────────────────────────────────
 with st.sidebar:
     st.header("Your Choices")
-    
+
     symbol = st.text_input(
-        "Which stock or crypto? (e.g. AAPL, TSLA, BTCUSD)",
+        "Which stocks or cryptos? (e.g. AAPL, TSLA, BTCUSD — separate several with commas)",
         value="AAPL"
     )
-    
+
     timeframe_label = st.selectbox(
         "How far apart should the prices be?",
         options=["1 minute", "1 hour", "1 day"],
         index=2  # default to 1 day
     )
-    
+
     # Map user-friendly label to API timespan value
     timeframe_map = {
         "1 minute": "minute",
@@ -40,14 +36,14 @@ with st.sidebar:
         "1 day": "day"
     }
     api_timespan = timeframe_map[timeframe_label]
-    
+
     capital = st.number_input(
         "How much money do you have to trade with? ($)",
         value=10000.0,
         step=1000.0,
         min_value=1000.0
     )
-    
+
     risk_percent = st.slider(
         "How much of your money are you willing to risk on ONE trade? (%)",
         min_value=0.5,
@@ -60,179 +56,126 @@ with st.sidebar:
 # ────────────────────────────────────────────────
 # API key
 # ────────────────────────────────────────────────
-POLYGON_KEY = os.environ.get("POLYGON_API_KEY")
 if not POLYGON_KEY:
     st.error("Missing connection key. Add POLYGON_API_KEY in Manage app → Secrets.")
     st.stop()
 
+# ────────────────────────────────────────────────
+# Table formats (module-level so they aren't rebuilt on every rerun;
+# formatting happens in the browser, not on the script thread)
+# ────────────────────────────────────────────────
+OHLC_CONFIG = {
+    "open": st.column_config.NumberColumn(format="$%.2f"),
+    "high": st.column_config.NumberColumn(format="$%.2f"),
+    "low": st.column_config.NumberColumn(format="$%.2f"),
+    "close": st.column_config.NumberColumn(format="$%.2f"),
+    "volume": st.column_config.NumberColumn(format="localized")
+}
+
+PATTERN_CONFIG = {
+    "close": st.column_config.NumberColumn(format="$%.2f"),
+    "Short Average Price (20)": st.column_config.NumberColumn(format="$%.2f"),
+    "Longer Average Price (50)": st.column_config.NumberColumn(format="$%.2f"),
+    "Overbought/Oversold Score (0-100)": st.column_config.NumberColumn(format="%.1f"),
+    "Momentum Line": st.column_config.NumberColumn(format="%.4f"),
+    "Momentum Signal Line": st.column_config.NumberColumn(format="%.4f"),
+    "Typical Daily Price Swing": st.column_config.NumberColumn(format="%.2f")
+}
+
+TRADES_CONFIG = {
+    "Entry Price": st.column_config.NumberColumn(format="$%.2f"),
+    "Safety Stop Price": st.column_config.NumberColumn(format="$%.2f"),
+    "Target Sell Price": st.column_config.NumberColumn(format="$%.2f"),
+    "Number of Shares": st.column_config.NumberColumn(format="localized")
+}
+
 # ────────────────────────────────────────────────
 # Get prices
 # ────────────────────────────────────────────────
-if st.button("Get Latest Prices"):
+@st.fragment
+def fetch_prices_section():
+    """Runs alone on 'Get Latest Prices' clicks instead of rerunning the whole script."""
+    if not st.button("Get Latest Prices"):
+        return
+    symbols = tuple(dict.fromkeys(
+        s.strip().upper() for s in symbol.split(",") if s.strip()))
+    if not symbols:
+        st.warning("Enter at least one symbol.")
+        return
+    # Only the download sits under the spinner; rendering happens after
+    # it clears.
     with st.spinner("Downloading prices..."):
         try:
-            client = RESTClient(api_key=POLYGON_KEY)
-            from_date = (datetime.now() - pd.Timedelta(days=90)).strftime("%Y-%m-%d")
-            to_date = datetime.now().strftime("%Y-%m-%d")
-
-            aggs = client.get_aggs(
-                ticker=symbol,
-                multiplier=1,
-                timespan=api_timespan,  # Now correct: 'minute', 'hour', 'day'
-                from_=from_date,
-                to=to_date,
-                limit=500
-            )
-
-            if not aggs:
-                st.warning("No prices found. Try a different stock or switch to '1 day'.")
-            else:
-                df = pd.DataFrame([{
-                    "Date/Time": pd.to_datetime(bar.timestamp, unit="ms"),
-                    "Open": bar.open,
-                    "High": bar.high,
-                    "Low": bar.low,
-                    "Close": bar.close,
-                    "Volume": bar.volume
-                } for bar in aggs]).set_index("Date/Time")
-
-                # Standardize columns to lowercase for calculations
-                df.columns = [col.lower() for col in df.columns]
-
-                st.session_state["data"] = df
-                st.success(f"Got {len(df)} price updates for {symbol} ({timeframe_label})")
-                st.dataframe(df.tail(10).style.format({
-                    "open": "${:,.2f}",
-                    "high": "${:,.2f}",
-                    "low": "${:,.2f}",
-                    "close": "${:,.2f}",
-                    "volume": "{:,.0f}"
-                }))
-
+            bars = fetch_bars(symbols, api_timespan, 90)
         except Exception as e:
             st.error(f"Couldn't get prices: {str(e)}")
             st.info("Common fixes: Use '1 day' if markets are closed, check symbol spelling, or verify your API key limits.")
-
-# ────────────────────────────────────────────────
-# Price patterns - using lowercase columns
-# ────────────────────────────────────────────────
-def calculate_price_patterns(df):
-    if df is None or df.empty:
-        st.warning("No data available to analyze. Click 'Get Latest Prices' first.")
-        return None
-
-    df = df.copy()
-
-    df['Short Average Price (20)'] = df['close'].rolling(window=20).mean()
-    df['Longer Average Price (50)'] = df['close'].ewm(span=50, adjust=False).mean()
-
-    delta = df['close'].diff()
-    gain = delta.where(delta > 0, 0).rolling(window=14).mean()
-    loss = -delta.where(delta < 0, 0).rolling(window=14).mean()
-    rs = gain / loss
-    df['Overbought/Oversold Score (0-100)'] = 100 - (100 / (1 + rs))
-
-    ema12 = df['close'].ewm(span=12, adjust=False).mean()
-    ema26 = df['close'].ewm(span=26, adjust=False).mean()
-    df['Momentum Line'] = ema12 - ema26
-    df['Momentum Signal Line'] = df['Momentum Line'].ewm(span=9, adjust=False).mean()
-
-    tr1 = df['high'] - df['low']
-    tr2 = abs(df['high'] - df['close'].shift())
-    tr3 = abs(df['low'] - df['close'].shift())
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-    df['Typical Daily Price Swing'] = tr.rolling(window=14).mean()
-
-    return df.dropna()
-
-# ────────────────────────────────────────────────
-# Find possible trades
-# ────────────────────────────────────────────────
-def find_possible_trades(df, capital, risk_pct):
-    if df is None or df.empty:
-        return None, None
-
-    df = calculate_price_patterns(df)
-    if df is None or df.empty:
-        return None, None
-
-    trades = []
-    for i in range(1, len(df)):
-        price = df['close'].iloc[i]
-        swing = df['Typical Daily Price Swing'].iloc[i]
-
-        # BUY
-        if (df['Short Average Price (20)'].iloc[i] > df['Longer Average Price (50)'].iloc[i] and
-            df['Short Average Price (20)'].iloc[i-1] <= df['Longer Average Price (50)'].iloc[i-1] and
-            df['Overbought/Oversold Score (0-100)'].iloc[i] < 70):
-
-            safety_stop = price - swing * 1.5
-            risk_amount = price - safety_stop
-            target_price = price + risk_amount * 2
-            shares = max(1, int((capital * risk_pct) / risk_amount))
-
-            trades.append({
-                "Date/Time": df.index[i],
-                "Buy or Sell": "BUY",
-                "Entry Price": price,
-                "Safety Stop Price": safety_stop,
-                "Target Sell Price": target_price,
-                "Number of Shares": shares
-            })
-
-        # SELL
-        elif ((df['Short Average Price (20)'].iloc[i] < df['Longer Average Price (50)'].iloc[i] and
-               df['Short Average Price (20)'].iloc[i-1] >= df['Longer Average Price (50)'].iloc[i-1]) or
-              df['Overbought/Oversold Score (0-100)'].iloc[i] > 70):
-
-            safety_stop = price + swing * 1.5
-            risk_amount = safety_stop - price
-            target_price = price - risk_amount * 2
-            shares = max(1, int((capital * risk_pct) / risk_amount))
-
-            trades.append({
-                "Date/Time": df.index[i],
-                "Buy or Sell": "SELL",
-                "Entry Price": price,
-                "Safety Stop Price": safety_stop,
-                "Target Sell Price": target_price,
-                "Number of Shares": shares
-            })
-
-    trades_df = pd.DataFrame(trades) if trades else pd.DataFrame()
-    return df, trades_df
+            return
+
+    loaded = {sym: df for sym, df in bars.items() if not df.empty}
+    missing = [sym for sym in symbols if sym not in loaded]
+
+    if missing:
+        st.warning(f"No prices found for {', '.join(missing)}. "
+                   "Try a different stock or switch to '1 day'.")
+    if loaded:
+        st.session_state["data"] = loaded
+        total = sum(len(df) for df in loaded.values())
+        st.success(f"Got {total} price updates for "
+                   f"{', '.join(loaded)} ({timeframe_label})")
+        for sym, df in loaded.items():
+            if len(loaded) > 1:
+                st.markdown(f"**{sym}**")
+            st.dataframe(df.tail(10), column_config=OHLC_CONFIG,
+                         use_container_width=True)
+
+fetch_prices_section()
 
 # ────────────────────────────────────────────────
 # Find trades button
 # ────────────────────────────────────────────────
-if "data" in st.session_state and st.button("Find Possible Trades"):
+@st.fragment
+def trade_scan_section():
+    """Runs alone on 'Find Possible Trades' clicks instead of rerunning the whole script."""
+    if not st.button("Find Possible Trades"):
+        return
+    if "data" not in st.session_state:
+        st.info("No prices loaded yet — click 'Get Latest Prices' first.")
+        return
+    data = st.session_state["data"]
+    # Only the computation sits under the spinner; rendering happens
+    # after it clears.
     with st.spinner("Looking for good opportunities..."):
-        data = st.session_state["data"]
-        pattern_df, trades_df = find_possible_trades(data, capital, risk_percent)
-
-        if pattern_df is not None:
-            st.subheader("Recent Price Patterns & Strength (Last 10 Prices)")
-            st.dataframe(pattern_df.tail(10).style.format({
-                "close": "${:,.2f}",
-                "Short Average Price (20)": "${:,.2f}",
-                "Longer Average Price (50)": "${:,.2f}",
-                "Overbought/Oversold Score (0-100)": "{:,.1f}",
-                "Momentum Line": "{:,.4f}",
-                "Momentum Signal Line": "{:,.4f}",
-                "Typical Daily Price Swing": "{:,.2f}"
-            }))
-
-        if not trades_df.empty:
-            st.subheader("Possible Trades Found")
-            st.dataframe(trades_df.style.format({
-                "Entry Price": "${:,.2f}",
-                "Safety Stop Price": "${:,.2f}",
-                "Target Sell Price": "${:,.2f}",
-                "Number of Shares": "{:,}"
-            }))
-            st.info("These are suggestions only. Always double-check and never risk more than you can afford to lose.")
-        else:
-            st.info("No clear opportunities right now. Try a different stock or timeframe.")
+        results = [(sym, *find_possible_trades(bars, capital, risk_percent))
+                   for sym, bars in data.items()]
+    for sym, pattern_df, trades_df in results:
+        scan_results(sym, pattern_df, trades_df, len(data) > 1)
+
+def scan_results(sym, pattern_df, trades_df, show_symbol):
+    """Render the pattern table and any trade suggestions for one symbol."""
+    if show_symbol:
+        st.markdown(f"**{sym}**")
+
+    if pattern_df is not None:
+        st.subheader("Recent Price Patterns & Strength (Last 10 Prices)")
+        st.dataframe(pattern_df.tail(10), column_config=PATTERN_CONFIG,
+                     use_container_width=True)
+
+    if trades_df is not None and not trades_df.empty:
+        st.subheader("Possible Trades Found")
+        # Table rendering cost grows with rows; never send more rows
+        # than we are willing to show.
+        trades_view = trades_df.tail(200)
+        if len(trades_view) < len(trades_df):
+            st.caption(f"Showing the {len(trades_view)} most recent of "
+                       f"{len(trades_df)} trades found.")
+        st.dataframe(trades_view, column_config=TRADES_CONFIG,
+                     use_container_width=True, hide_index=True)
+        st.info("These are suggestions only. Always double-check and never risk more than you can afford to lose.")
+    else:
+        st.info("No clear opportunities right now. Try a different stock or timeframe.")
+
+trade_scan_section()
 
 st.markdown("---")
 st.caption("This is a learning tool — not financial advice. Test everything in paper trading mode first.")
@@ -0,0 +1,243 @@
+"""Shared data and analysis helpers for the trading apps.
+
+Houses the Polygon fetch, the indicator pipeline and the signal scan so
+every Streamlit view shares one set of @st.cache_* entries instead of
+recomputing per page.
+"""
+import streamlit as st
+import os
+import pandas as pd
+import numpy as np
+import numba
+import bottleneck as bn
+import asyncio
+import httpx
+from datetime import datetime
+
+import numexpr as ne
+
+# pandas already imported numexpr above, so the env-var route to sizing
+# its thread pool is too late here; set the count explicitly instead.
+ne.set_num_threads(os.cpu_count() or 1)
+
+# Let pandas route large elementwise expressions through numexpr too.
+pd.set_option("compute.use_numexpr", True)
+
+POLYGON_KEY = os.environ.get("POLYGON_API_KEY")
+POLYGON_BASE_URL = "https://api.polygon.io"
+BAR_CACHE_DIR = "./cache"
+
+# ────────────────────────────────────────────────
+# Get prices
+# ────────────────────────────────────────────────
+def _bar_cache_path(symbol: str, timespan: str) -> str:
+    safe_symbol = "".join(ch for ch in symbol.upper() if ch.isalnum())
+    return os.path.join(BAR_CACHE_DIR, f"{safe_symbol}_{timespan}.parquet")
+
+def _bars_frame(results: list) -> pd.DataFrame:
+    """Turn the aggs payload (list of {'t','o','h','l','c','v'} dicts) into a
+    DataFrame. Typed column arrays are filled in one pass so pandas gets
+    contiguous columns directly instead of inferring dtypes row by row."""
+    n = len(results)
+    # float32 is plenty for display and the short-window indicators, and
+    # halves the frame's memory and websocket payload vs float64.
+    ts = np.empty(n, dtype='int64')
+    o = np.empty(n, dtype=np.float32)
+    h = np.empty(n, dtype=np.float32)
+    l = np.empty(n, dtype=np.float32)
+    c = np.empty(n, dtype=np.float32)
+    v = np.empty(n, dtype=np.int64)
+    for i, bar in enumerate(results):
+        ts[i] = bar["t"]
+        o[i] = bar["o"]
+        h[i] = bar["h"]
+        l[i] = bar["l"]
+        c[i] = bar["c"]
+        v[i] = bar["v"]
+
+    df = pd.DataFrame(
+        {"open": o, "high": h, "low": l, "close": c, "volume": v},
+        index=pd.to_datetime(ts, unit="ms")
+    )
+    df.index.name = "Date/Time"
+    return df
+
+@st.cache_data(ttl=3600, persist="disk", show_spinner=False)
+def fetch_bars(symbols: tuple, timespan: str, days: int) -> dict:
+    """Download recent bars for one or more symbols, all requests in flight
+    at once. Cached (in RAM and on disk, so a server restart doesn't re-hit
+    Polygon) keyed on the inputs; reruns that only change capital/risk skip
+    the network entirely. Each symbol's bars are also written to a local
+    Parquet file used as a fallback when Polygon is unreachable.
+
+    Returns {symbol: DataFrame}; a symbol with no bars maps to an empty frame.
+    """
+    now = datetime.now()
+    from_date = (now - pd.Timedelta(days=days)).strftime("%Y-%m-%d")
+    to_date = now.strftime("%Y-%m-%d")
+
+    async def fetch_one(client, sym):
+        url = f"/v2/aggs/ticker/{sym}/range/1/{timespan}/{from_date}/{to_date}"
+        try:
+            resp = await client.get(url, params={
+                "adjusted": "true",
+                "sort": "asc",
+                "limit": 500,
+                "apiKey": POLYGON_KEY
+            })
+            resp.raise_for_status()
+            return sym, resp.json().get("results") or []
+        except Exception:
+            # Offline / rate-limited: serve the last bars we saved, if any.
+            cached = _bar_cache_path(sym, timespan)
+            if os.path.exists(cached):
+                return sym, pd.read_parquet(cached)
+            raise
+
+    async def fetch_all():
+        # The client lives for one batch: httpx.AsyncClient is bound to the
+        # event loop it first runs on, and asyncio.run creates a fresh loop
+        # per rerun, so a @st.cache_resource client would break on reuse.
+        limits = httpx.Limits(max_connections=20)
+        async with httpx.AsyncClient(base_url=POLYGON_BASE_URL, timeout=30.0,
+                                     limits=limits) as client:
+            return await asyncio.gather(*(fetch_one(client, s) for s in symbols))
+
+    bars = {}
+    for sym, results in asyncio.run(fetch_all()):
+        if isinstance(results, pd.DataFrame):  # served from the Parquet fallback
+            bars[sym] = results
+        elif not results:
+            bars[sym] = pd.DataFrame()
+        else:
+            df = _bars_frame(results)
+            os.makedirs(BAR_CACHE_DIR, exist_ok=True)
+            df.to_parquet(_bar_cache_path(sym, timespan))
+            bars[sym] = df
+    return bars
+
+# ────────────────────────────────────────────────
+# Price patterns - using lowercase columns
+# ────────────────────────────────────────────────
+@numba.njit(cache=True)
+def _triple_ewm(x, a12, a26, a50):
+    """Compute the span-12, span-26 and span-50 EWMs of x in one pass,
+    so each close value is read from memory once instead of three times."""
+    n = x.shape[0]
+    e12 = np.empty(n)
+    e26 = np.empty(n)
+    e50 = np.empty(n)
+    e12[0] = e26[0] = e50[0] = x[0]
+    for i in range(1, n):
+        e12[i] = a12 * x[i] + (1 - a12) * e12[i - 1]
+        e26[i] = a26 * x[i] + (1 - a26) * e26[i - 1]
+        e50[i] = a50 * x[i] + (1 - a50) * e50[i - 1]
+    return e12, e26, e50
+
+@st.cache_data(show_spinner=False)
+def calculate_price_patterns(df):
+    # bn.move_mean rejects windows longer than the input, and every row
+    # would be dropped as NaN anyway; bail out like the empty case so the
+    # caller shows its friendly message.
+    if df is None or len(df) < 20:
+        return None
+
+    close = df['close'].to_numpy()
+    high = df['high'].to_numpy()
+    low = df['low'].to_numpy()
+
+    ema12, ema26, ema50 = _triple_ewm(close, 2 / 13, 2 / 27, 2 / 51)
+
+    delta = np.diff(close, prepend=close[0])
+    avg_gain = bn.move_mean(np.where(delta > 0, delta, 0.0), window=14)
+    avg_loss = bn.move_mean(np.where(delta < 0, -delta, 0.0), window=14)
+    # One multithreaded numexpr pass instead of three NumPy temporaries.
+    rsi = ne.evaluate("100 - 100 / (1 + avg_gain / avg_loss)")
+
+    momentum = ema12 - ema26
+    momentum_signal = pd.Series(momentum).ewm(span=9, adjust=False).mean().to_numpy()
+
+    prev_close = np.empty_like(close)
+    prev_close[0] = close[0]
+    prev_close[1:] = close[:-1]
+    tr = np.maximum.reduce([high - low,
+                            np.abs(high - prev_close),
+                            np.abs(low - prev_close)])
+
+    # One assign builds the output frame in a single step, instead of an
+    # up-front full copy mutated column by column.
+    return df.assign(**{
+        'Short Average Price (20)': bn.move_mean(close, window=20),
+        'Longer Average Price (50)': ema50,
+        'Overbought/Oversold Score (0-100)': rsi,
+        'Momentum Line': momentum,
+        'Momentum Signal Line': momentum_signal,
+        'Typical Daily Price Swing': bn.move_mean(tr, window=14)
+    }).dropna()
+
+# ────────────────────────────────────────────────
+# Find possible trades
+# ────────────────────────────────────────────────
+@numba.njit(cache=True)
+def _scan_signals(short_avg, long_avg, score, swing, price, capital, risk_pct):
+    """Single fused pass over the indicator arrays: crossover detection,
+    stop/target placement and position sizing, writing straight into
+    preallocated output arrays (trimmed to the number of hits)."""
+    n = short_avg.shape[0]
+    idx = np.empty(n, np.int64)
+    is_buy = np.empty(n, np.bool_)
+    safety_stop = np.empty(n)
+    target_price = np.empty(n)
+    shares = np.empty(n, np.int64)
+    k = 0
+    for i in range(1, n):
+        cross_up = short_avg[i] > long_avg[i] and short_avg[i - 1] <= long_avg[i - 1]
+        cross_down = short_avg[i] < long_avg[i] and short_avg[i - 1] >= long_avg[i - 1]
+        buy = cross_up and score[i] < 70
+        if not buy and not (cross_down or score[i] > 70):
+            continue
+        risk_amount = swing[i] * 1.5
+        idx[k] = i
+        is_buy[k] = buy
+        if buy:
+            safety_stop[k] = price[i] - risk_amount
+            target_price[k] = price[i] + risk_amount * 2
+        else:
+            safety_stop[k] = price[i] + risk_amount
+            target_price[k] = price[i] - risk_amount * 2
+        shares[k] = max(1, int((capital * risk_pct) / risk_amount))
+        k += 1
+    return idx[:k], is_buy[:k], safety_stop[:k], target_price[:k], shares[:k]
+
+@st.cache_data(show_spinner=False)
+def generate_trade_signals(df, capital, risk_pct):
+    short_avg = df['Short Average Price (20)'].to_numpy()
+    long_avg = df['Longer Average Price (50)'].to_numpy()
+    score = df['Overbought/Oversold Score (0-100)'].to_numpy()
+    swing = df['Typical Daily Price Swing'].to_numpy()
+    price = df['close'].to_numpy()
+
+    idx, is_buy, safety_stop, target_price, shares = _scan_signals(
+        short_avg, long_avg, score, swing, price, float(capital), float(risk_pct))
+    if idx.size == 0:
+        return pd.DataFrame()
+
+    trades_df = pd.DataFrame({
+        "Date/Time": df.index[idx],
+        "Buy or Sell": np.where(is_buy, "BUY", "SELL"),
+        "Entry Price": price[idx],
+        "Safety Stop Price": safety_stop,
+        "Target Sell Price": target_price,
+        "Number of Shares": shares
+    })
+    return trades_df
+
+def find_possible_trades(df, capital, risk_pct):
+    if df is None or df.empty:
+        return None, None
+
+    df = calculate_price_patterns(df)
+    if df is None or df.empty:
+        return None, None
+
+    return df, generate_trade_signals(df, capital, risk_pct)